@@ -7,6 +7,10 @@ import logging
 import os
 import uvicorn
 
+from faq_serving import (
+    EAGER_LOAD, BotLoader, InferencePool, MicroBatcher, ServiceOverloaded, create_faq_bot
+)
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -27,23 +31,21 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize FAQ Bot as None (will be loaded on first request)
-faq_bot = None
+# Loads the FAQ Bot in the background at startup (or on first request) and tracks progress
+bot_loader = BotLoader(create_faq_bot)
 
 def get_faq_bot():
-    """Lazy load FAQ Bot on first request"""
-    global faq_bot
-    if faq_bot is None:
-        logger.info("Loading FAQ Bot model...")
-        try:
-            # Import FAQBot only when needed
-            from faq_bot import FAQBot
-            faq_bot = FAQBot()
-            logger.info("FAQ Bot model loaded successfully!")
-        except Exception as e:
-            logger.error(f"Failed to load FAQ Bot: {str(e)}")
-            raise
-    return faq_bot
+    """Return the FAQ Bot, loading it first if needed (blocking; call from the inference pool)"""
+    return bot_loader.get()
+
+# Runs model loading and inference off the event loop with bounded queueing
+inference_pool = InferencePool()
+
+# Gathers concurrent /faq requests into a single model.encode call
+batcher = MicroBatcher(get_faq_bot, inference_pool)
+
+# Maximum number of questions accepted by /faq/batch
+MAX_BATCH_QUESTIONS = int(os.environ.get("FAQ_MAX_BATCH_QUESTIONS", 64))
 
 # Pydantic models for request/response
 class QueryRequest(BaseModel):
@@ -64,11 +66,34 @@ class QueryResponse(BaseModel):
     query: str
     total_results: int
 
+class BatchQueryRequest(BaseModel):
+    questions: List[str]
+    top_k: Optional[int] = 3
+    min_score: Optional[float] = 0.0
+
+class BatchQueryResponse(BaseModel):
+    success: bool
+    responses: List[QueryResponse]
+    total_queries: int
+
 class HealthResponse(BaseModel):
     status: str
     message: str
     model_loaded: bool
 
+class ProbeResponse(BaseModel):
+    status: str
+    ready: bool
+    state: str
+    elapsed_seconds: Optional[float] = None
+    error: Optional[str] = None
+
+@app.on_event("startup")
+async def start_loading_faq_bot():
+    """Start loading and warming up the model in the background once the app starts"""
+    if EAGER_LOAD:
+        bot_loader.start(inference_pool)
+
 # API Routes
 @app.get("/", response_model=dict)
 async def root():
@@ -78,7 +103,10 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "health": "/health",
+            "liveness": "/livez",
+            "readiness": "/readyz",
             "query": "/faq",
+            "batch_query": "/faq/batch",
             "docs": "/docs"
         }
     }
@@ -86,12 +114,91 @@ async def root():
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
     """Health check endpoint"""
+    faq_bot = bot_loader.bot
     return HealthResponse(
         status="healthy" if faq_bot is not None else "unhealthy",
         message="FAQ Bot is ready" if faq_bot is not None else "FAQ Bot not loaded yet",
         model_loaded=faq_bot is not None
     )
 
+def _greeting_response(question):
+    """Return a canned response for conversational greetings/check-ins, else None"""
+    question_lower = question.lower().strip()
+    conversational_patterns = [
+        "how are you", "how r u", "how are u", "how's it going", 
+        "what's up", "whats up", "hey", "hi there", "hello",
+        "good morning", "good afternoon", "good evening"
+    ]
+    
+    if any(pattern in question_lower for pattern in conversational_patterns):
+        return QueryResponse(
+            success=True,
+            results=[FAQResult(
+                question="How can I help you?",
+                answer="Hello! I'm here to help with mental health questions. You can ask me about:\n\n• Stress and anxiety management\n• Depression and mood\n• Sleep problems\n• Coping strategies\n• Mental health resources\n• Self-care tips\n\nWhat would you like to know about?",
+                score=1.0,
+                category="Greeting"
+            )],
+            message="I'm ready to help with mental health questions!",
+            query=question,
+            total_results=1
+        )
+    return None
+
+def _overloaded_exception(exc):
+    """503 telling the client when to retry once the inference queue is full"""
+    logger.warning("Inference queue full, rejecting request")
+    return HTTPException(
+        status_code=503,
+        detail=str(exc),
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+def _answer_batch(questions, top_k):
+    return get_faq_bot().get_most_similar_batch(questions, top_k=top_k)
+
+def _build_query_response(question, results, min_score):
+    """Filter raw FAQBot results by min_score and wrap them in a QueryResponse"""
+    # Filter by minimum score and format results
+    filtered_results = [
+        FAQResult(
+            question=result.get('question', '').strip(),
+            answer=result.get('answer', result.get('text', '')).strip(),
+            score=round(float(result.get('score', 0.0)), 4),
+            category=result.get('category', 'General')
+        )
+        for result in results
+        if result.get('score', 0.0) >= min_score
+    ]
+    
+    # Determine response message
+    message = None
+    if not filtered_results:
+        message = "No results found matching your criteria. Try lowering the minimum score or rephrasing your question."
+    elif filtered_results and filtered_results[0].score < 0.5:
+        message = "The results have low confidence. Consider rephrasing your question for better matches."
+    
+    return QueryResponse(
+        success=True,
+        results=filtered_results,
+        message=message,
+        query=question,
+        total_results=len(filtered_results)
+    )
+
+@app.get("/livez", response_model=ProbeResponse)
+async def liveness_check():
+    """Liveness probe: the process and event loop are responsive (model may still be loading)"""
+    return ProbeResponse(status="alive", **bot_loader.status())
+
+@app.get("/readyz", response_model=ProbeResponse)
+async def readiness_check():
+    """Readiness probe: 200 only once the model is loaded and warmed up, 503 before"""
+    status = bot_loader.status()
+    if not status["ready"]:
+        return JSONResponse(status_code=503, content=ProbeResponse(status="not_ready", **status).dict())
+    return ProbeResponse(status="ready", **status)
+
 @app.post("/faq", response_model=QueryResponse)
 async def query_faq(request: QueryRequest):
     """
@@ -102,34 +209,14 @@ async def query_faq(request: QueryRequest):
     - **min_score**: Minimum similarity score to include (default: 0.0, range: 0.0-1.0)
     """
     try:
-        # Load FAQ bot on first request (lazy loading)
-        bot = get_faq_bot()
-        
         # Validate input
         if not request.question.strip():
             raise HTTPException(status_code=400, detail="Question cannot be empty")
         
         # Detect conversational greetings/check-ins
-        question_lower = request.question.lower().strip()
-        conversational_patterns = [
-            "how are you", "how r u", "how are u", "how's it going", 
-            "what's up", "whats up", "hey", "hi there", "hello",
-            "good morning", "good afternoon", "good evening"
-        ]
-        
-        if any(pattern in question_lower for pattern in conversational_patterns):
-            return QueryResponse(
-                success=True,
-                results=[FAQResult(
-                    question="How can I help you?",
-                    answer="Hello! I'm here to help with mental health questions. You can ask me about:\n\n• Stress and anxiety management\n• Depression and mood\n• Sleep problems\n• Coping strategies\n• Mental health resources\n• Self-care tips\n\nWhat would you like to know about?",
-                    score=1.0,
-                    category="Greeting"
-                )],
-                message="I'm ready to help with mental health questions!",
-                query=request.question,
-                total_results=1
-            )
+        greeting = _greeting_response(request.question)
+        if greeting is not None:
+            return greeting
         
         # Limit top_k to reasonable bounds
         top_k = min(max(request.top_k, 1), 10)
@@ -137,53 +224,87 @@ async def query_faq(request: QueryRequest):
         
         logger.info(f"Processing query: '{request.question[:50]}...' (top_k={top_k}, min_score={min_score})")
         
-        # Get results from FAQ bot
-        results = bot.get_most_similar(request.question, top_k=top_k)
+        # Get results from FAQ bot, batched with any concurrent requests
+        # (the bot is loaded lazily on the inference pool on first use)
+        results = await batcher.submit(request.question, top_k=top_k)
+        
+        return _build_query_response(request.question, results, min_score)
         
-        # Filter by minimum score and format results
-        filtered_results = [
-            FAQResult(
-                question=result.get('question', '').strip(),
-                answer=result.get('answer', result.get('text', '')).strip(),
-                score=round(float(result.get('score', 0.0)), 4),
-                category=result.get('category', 'General')
+    except HTTPException:
+        raise
+    except ServiceOverloaded as e:
+        raise _overloaded_exception(e)
+    except Exception as e:
+        logger.error(f"Error processing query: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+@app.post("/faq/batch", response_model=BatchQueryResponse)
+async def query_faq_batch(request: BatchQueryRequest):
+    """
+    Query the FAQ bot with several questions at once
+    
+    - **questions**: List of user questions (max: 64 by default)
+    - **top_k**: Number of top results to return per question (default: 3, max: 10)
+    - **min_score**: Minimum similarity score to include (default: 0.0, range: 0.0-1.0)
+    """
+    try:
+        # Validate input
+        if not request.questions:
+            raise HTTPException(status_code=400, detail="Questions cannot be empty")
+        if len(request.questions) > MAX_BATCH_QUESTIONS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"At most {MAX_BATCH_QUESTIONS} questions are allowed per batch"
             )
-            for result in results
-            if result.get('score', 0.0) >= min_score
-        ]
+        if any(not question.strip() for question in request.questions):
+            raise HTTPException(status_code=400, detail="Questions cannot be empty")
+        
+        top_k = min(max(request.top_k, 1), 10)
+        min_score = max(min(request.min_score, 1.0), 0.0)
         
-        # Determine response message
-        message = None
-        if not filtered_results:
-            message = "No results found matching your criteria. Try lowering the minimum score or rephrasing your question."
-        elif filtered_results and filtered_results[0].score < 0.5:
-            message = "The results have low confidence. Consider rephrasing your question for better matches."
+        logger.info(f"Processing batch of {len(request.questions)} queries (top_k={top_k}, min_score={min_score})")
         
-        return QueryResponse(
+        # Greetings are answered directly; everything else goes through one encode
+        responses = [_greeting_response(question) for question in request.questions]
+        pending = [i for i, response in enumerate(responses) if response is None]
+        if pending:
+            batch_results = await inference_pool.run(
+                _answer_batch,
+                [request.questions[i] for i in pending],
+                top_k,
+                weight=len(pending)
+            )
+            for i, results in zip(pending, batch_results):
+                responses[i] = _build_query_response(request.questions[i], results, min_score)
+        
+        return BatchQueryResponse(
             success=True,
-            results=filtered_results,
-            message=message,
-            query=request.question,
-            total_results=len(filtered_results)
+            responses=responses,
+            total_queries=len(responses)
         )
         
     except HTTPException:
         raise
+    except ServiceOverloaded as e:
+        raise _overloaded_exception(e)
     except Exception as e:
-        logger.error(f"Error processing query: {str(e)}")
+        logger.error(f"Error processing batch query: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 @app.get("/stats", response_model=dict)
 async def get_stats():
     """Get statistics about the FAQ database"""
     try:
+        faq_bot = bot_loader.bot
         if faq_bot is None:
             raise HTTPException(status_code=503, detail="FAQ Bot model is not available")
         
         return {
             "total_faqs": len(faq_bot.faq_df),
             "model_name": "sentence-transformers/all-MiniLM-L6-v2",
-            "embedding_dimensions": faq_bot.question_embeddings.shape[1] if hasattr(faq_bot.question_embeddings, 'shape') else "unknown"
+            "embedding_dimensions": faq_bot.question_embeddings.shape[1] if hasattr(faq_bot.question_embeddings, 'shape') else "unknown",
+            "result_cache": faq_bot.result_cache.stats(),
+            "embedding_cache": faq_bot.embedding_cache.stats()
         }
     except HTTPException:
         raise
@@ -1,25 +1,43 @@
 import numpy as np
 import pandas as pd
 from sentence_transformers import SentenceTransformer
-from scipy.spatial.distance import cosine
 import nltk
 from nltk.corpus import stopwords
 from nltk.tokenize import word_tokenize
 import re
+import os
+import logging
+
+from faq_index import (
+    SimilarityEngine, l2_normalize, load_index, save_index, model_fingerprint,
+    text_fingerprint
+)
+from faq_cache import EmbeddingCache, LRUCache
+
+logger = logging.getLogger(__name__)
 
 class FAQBot:
-    def __init__(self, model_path='./faq_model', faq_path='processed_faq.csv'):
+    def __init__(self, model_path='./faq_model', faq_path='processed_faq.csv', index_path=None,
+                 result_cache_size=1024, result_cache_ttl=3600, embedding_cache=None,
+                 embedding_cache_mb=16):
+        # Ranked results keyed on (cleaned query, top_k), and raw query -> cleaned query
+        self.result_cache = LRUCache(result_cache_size, result_cache_ttl)
+        self.cleaned_query_cache = LRUCache(result_cache_size)
+        
+        # Query embeddings keyed on cleaned text; may be shared with other FAQBot instances
+        self.embedding_cache = embedding_cache or EmbeddingCache(embedding_cache_mb)
+        
         # Load the trained model
         self.model = SentenceTransformer(model_path)
         
         # Load the processed FAQ data
         self.faq_df = pd.read_csv(faq_path)
         
-        # Precompute embeddings for all questions
-        self.question_embeddings = self.model.encode(
-            self.faq_df['cleaned_question'].tolist(), 
-            convert_to_tensor=True
-        )
+        # Load question embeddings from the on-disk index, re-encoding only if stale
+        self.index_path = index_path or os.path.join(model_path, 'faq_index')
+        self.model_fingerprint = model_fingerprint(model_path)
+        self.embedding_cache.bind(self.model_fingerprint)
+        self._set_index(self._load_or_build_index(self.faq_df['cleaned_question'].tolist()))
         
         # Initialize NLTK (download quietly to avoid blocking)
         try:
@@ -30,6 +48,41 @@ class FAQBot:
             # If NLTK download fails, use empty stopwords set
             self.stop_words = set()
     
+    def _load_or_build_index(self, texts):
+        """Memory-map the persisted index if it matches this model and corpus"""
+        text_fp = text_fingerprint(texts)
+        index = load_index(self.index_path, self.model_fingerprint, text_fp)
+        if index is not None:
+            embeddings, self.row_ids, _ = index
+            logger.info(f"Loaded FAQ index from {self.index_path} ({len(embeddings)} rows)")
+            return embeddings
+        
+        logger.info("FAQ index missing or stale, encoding corpus...")
+        embeddings = self.model.encode(texts, convert_to_numpy=True)
+        if 'Question_ID' in self.faq_df.columns:
+            self.row_ids = self.faq_df['Question_ID'].to_numpy()
+        else:
+            self.row_ids = np.arange(len(self.faq_df))
+        try:
+            save_index(self.index_path, embeddings, self.row_ids, self.model_fingerprint, text_fp)
+        except OSError as e:
+            # A read-only filesystem should not stop the bot from serving
+            logger.warning(f"Could not persist FAQ index to {self.index_path}: {str(e)}")
+        return l2_normalize(embeddings)
+    
+    def _set_index(self, embeddings):
+        """Swap in a new embedding matrix; cached results from the old one are dropped"""
+        self.question_embeddings = embeddings
+        self.engine = SimilarityEngine(embeddings, normalized=True)
+        self.result_cache.clear()
+    
+    def _clean_query(self, query):
+        cleaned = self.cleaned_query_cache.get(query)
+        if cleaned is None:
+            cleaned = self.clean_text(query)
+            self.cleaned_query_cache.put(query, cleaned)
+        return cleaned
+    
     def clean_text(self, text):
         # Convert to string if not already
         text = str(text)
@@ -62,23 +115,50 @@ class FAQBot:
         return text
     
     def get_most_similar(self, query, top_k=3):
-        # Clean and encode the query
-        cleaned_query = self.clean_text(query)
-        query_embedding = self.model.encode(cleaned_query, convert_to_tensor=True)
+        return self.get_most_similar_batch([query], top_k=top_k)[0]
+    
+    def get_most_similar_batch(self, queries, top_k=3):
+        """Answer several queries with a single model.encode call"""
+        cleaned_queries = [self._clean_query(query) for query in queries]
         
-        # Calculate similarity with all questions
-        similarities = []
-        for i, q_embedding in enumerate(self.question_embeddings):
-            # Calculate cosine similarity (1 - cosine distance)
-            sim = 1 - cosine(query_embedding.cpu().numpy(), q_embedding.cpu().numpy())
-            similarities.append((i, sim))
+        # Serve repeated queries from the result cache
+        answers = {}
+        for cleaned in set(cleaned_queries):
+            cached = self.result_cache.get((cleaned, top_k))
+            if cached is not None:
+                answers[cleaned] = cached
         
-        # Sort by similarity score in descending order
-        similarities.sort(key=lambda x: x[1], reverse=True)
+        # Encode the remaining distinct queries in one forward pass
+        misses = [cleaned for cleaned in dict.fromkeys(cleaned_queries) if cleaned not in answers]
+        if misses:
+            query_embeddings = self._encode_queries(misses)
+            
+            # Score the whole batch against the corpus and keep the top-k per query
+            searches = self.engine.search_batch(query_embeddings, top_k=top_k)
+            for cleaned, (indices, scores) in zip(misses, searches):
+                answers[cleaned] = self._build_results(indices, scores)
+                self.result_cache.put((cleaned, top_k), answers[cleaned])
         
+        # Hand out copies so callers cannot mutate cached entries
+        return [[dict(result) for result in answers[cleaned]] for cleaned in cleaned_queries]
+    
+    def _encode_queries(self, cleaned_queries):
+        """Normalized embeddings for cleaned queries, encoding only those not cached"""
+        embeddings = [self.embedding_cache.get(cleaned) for cleaned in cleaned_queries]
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            encoded = l2_normalize(self.model.encode(
+                [cleaned_queries[i] for i in missing], convert_to_numpy=True
+            ))
+            for i, embedding in zip(missing, encoded):
+                embeddings[i] = embedding
+                self.embedding_cache.put(cleaned_queries[i], embedding)
+        return np.vstack(embeddings)
+    
+    def _build_results(self, indices, scores):
         # Get top-k most similar questions and answers
         results = []
-        for idx, score in similarities[:top_k]:
+        for idx, score in zip(indices, scores):
             results.append({
                 'question': self.faq_df.iloc[idx]['Questions'],
                 'answer': self._format_response(self.faq_df.iloc[idx]['Answers']),
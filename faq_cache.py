@@ -0,0 +1,148 @@
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+class LRUCache:
+    """Thread-safe LRU cache with an optional time-to-live and hit/miss counters
+
+    A ``max_size`` of 0 disables the cache: every lookup is a miss and nothing
+    is stored.
+    """
+
+    def __init__(self, max_size=1024, ttl_seconds=None):
+        self.max_size = max(int(max_size), 0)
+        self.ttl_seconds = ttl_seconds if ttl_seconds and ttl_seconds > 0 else None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Return the cached value, or None on a miss or an expired entry"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        if self.max_size == 0:
+            return
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every entry (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class EmbeddingCache:
+    """LRU cache of normalized query embeddings with a memory budget in MB
+
+    Vectors are stored compactly as float32 bytes. Entries depend only on the
+    encoder, not on the FAQ index, so one cache can outlive index reloads and be
+    shared between FAQBot instances; ``bind`` drops everything when the model
+    fingerprint changes.
+    """
+
+    # Rough per-entry bookkeeping cost (dict slot, tuple, bytes header) on CPython
+    ENTRY_OVERHEAD_BYTES = 200
+
+    def __init__(self, max_mb=16):
+        self.max_bytes = max(int(max_mb * 1024 * 1024), 0)
+        self.model_fingerprint = None
+        self.bytes_used = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def bind(self, model_fingerprint):
+        """Attach the cache to an encoder, clearing it if the encoder changed"""
+        with self._lock:
+            if model_fingerprint != self.model_fingerprint:
+                self._entries.clear()
+                self.bytes_used = 0
+                self.model_fingerprint = model_fingerprint
+
+    def get(self, text):
+        """Return the cached float32 vector for text, or None"""
+        with self._lock:
+            blob = self._entries.get(text)
+            if blob is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(text)
+            self.hits += 1
+        return np.frombuffer(blob, dtype=np.float32)
+
+    def put(self, text, vector):
+        blob = np.asarray(vector, dtype=np.float32).tobytes()
+        cost = self._cost(text, blob)
+        if cost > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(text, None)
+            if previous is not None:
+                self.bytes_used -= self._cost(text, previous)
+            self._entries[text] = blob
+            self.bytes_used += cost
+            while self.bytes_used > self.max_bytes:
+                old_text, old_blob = self._entries.popitem(last=False)
+                self.bytes_used -= self._cost(old_text, old_blob)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes_used = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "memory_mb": round(self.bytes_used / (1024 * 1024), 3),
+            "max_memory_mb": round(self.max_bytes / (1024 * 1024), 3),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def _cost(self, text, blob):
+        return len(blob) + len(text) + self.ENTRY_OVERHEAD_BYTES
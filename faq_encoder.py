@@ -0,0 +1,83 @@
+"""
+Sentence encoders used by FAQBot, selected by backend name ('torch' or 'onnx')
+"""
+import json
+import os
+
+import numpy as np
+
+# Written by FAQModel._convert_to_onnx next to model.onnx
+ONNX_CONFIG_FILE = 'encoder_config.json'
+
+
+def load_encoder(model_path, backend='torch', onnx_path=None, intra_op_threads=None):
+    """Return (encoder, encoder_dir) for the requested backend
+
+    Every encoder exposes ``encode(texts, convert_to_numpy=True, batch_size=32)``
+    like SentenceTransformer. ``encoder_dir`` is the directory whose contents
+    define the embeddings, used to fingerprint the index.
+    """
+    if backend == 'torch':
+        # Imported lazily so ONNX-only deployments never load torch
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(model_path), model_path
+    if backend == 'onnx':
+        onnx_path = onnx_path or os.path.join(model_path, 'onnx')
+        return OnnxEncoder(onnx_path, intra_op_threads=intra_op_threads), onnx_path
+    raise ValueError(f"Unknown encoder backend '{backend}' (expected 'torch' or 'onnx')")
+
+
+class OnnxEncoder:
+    """Run the exported FAQ encoder (mean pooling + L2 norm in-graph) with ONNX Runtime
+
+    Tokenization uses the standalone ``tokenizers`` library, so neither torch
+    nor transformers is imported at serving time.
+    """
+
+    def __init__(self, onnx_path, model_file='model.onnx', intra_op_threads=None):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        with open(os.path.join(onnx_path, ONNX_CONFIG_FILE), 'r', encoding='utf-8') as f:
+            self.config = json.load(f)
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(onnx_path, 'tokenizer.json'))
+        self.tokenizer.enable_truncation(max_length=self.config.get('max_seq_length', 256))
+        self.tokenizer.enable_padding(pad_id=self.config.get('pad_token_id', 0))
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        # One request is one graph run: spend threads inside ops, not across them
+        options.intra_op_num_threads = intra_op_threads or (os.cpu_count() or 1)
+        options.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(
+            os.path.join(onnx_path, model_file), options, providers=['CPUExecutionProvider']
+        )
+        self.input_names = [i.name for i in self.session.get_inputs()]
+        self.output_name = self.config.get('output_name', 'sentence_embedding')
+        self.dimension = self.config['dimension']
+
+    def encode(self, texts, convert_to_numpy=True, batch_size=32, **kwargs):
+        """Encode a string or list of strings into L2-normalized float32 vectors"""
+        single = isinstance(texts, str)
+        if single:
+            texts = [texts]
+
+        # Sort by length so each batch pads to a similar size, then restore order
+        order = np.argsort([-len(text) for text in texts], kind='stable')
+        embeddings = np.empty((len(texts), self.dimension), dtype=np.float32)
+        for start in range(0, len(texts), batch_size):
+            batch_idx = order[start:start + batch_size]
+            embeddings[batch_idx] = self._run([texts[i] for i in batch_idx])
+        return embeddings[0] if single else embeddings
+
+    def _run(self, texts):
+        encodings = self.tokenizer.encode_batch(texts)
+        feeds = {
+            'input_ids': np.array([e.ids for e in encodings], dtype=np.int64),
+            'attention_mask': np.array([e.attention_mask for e in encodings], dtype=np.int64),
+            'token_type_ids': np.array([e.type_ids for e in encodings], dtype=np.int64),
+        }
+        feeds = {name: feeds[name] for name in self.input_names}
+        return self.session.run([self.output_name], feeds)[0]
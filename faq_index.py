@@ -0,0 +1,168 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+
+# Bump whenever the on-disk layout written by save_index changes
+INDEX_FORMAT_VERSION = 1
+
+# Files inside a model directory that are data artifacts, not part of the encoder
+_NON_MODEL_FILES = {'faq_list.json', 'README.md'}
+_MODEL_FILE_SUFFIXES = ('.json', '.txt', '.safetensors', '.bin', '.model')
+
+
+def l2_normalize(vectors):
+    """L2-normalize a vector or the rows of a matrix as contiguous float32"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    # Leave all-zero rows as zeros instead of dividing by zero
+    norms[norms == 0] = 1.0
+    return np.ascontiguousarray(vectors / norms)
+
+
+class SimilarityEngine:
+    """Exact cosine-similarity top-k search over a normalized embedding matrix"""
+
+    def __init__(self, embeddings, normalized=False):
+        # Keep the corpus as one contiguous float32 block so scoring is a single GEMV
+        if normalized:
+            self.embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        else:
+            self.embeddings = l2_normalize(embeddings)
+
+    def __len__(self):
+        return self.embeddings.shape[0]
+
+    @property
+    def dimension(self):
+        return self.embeddings.shape[1]
+
+    def scores(self, query_embedding):
+        """Cosine similarity of a query vector against every corpus row"""
+        return self.embeddings @ l2_normalize(query_embedding)
+
+    def search(self, query_embedding, top_k=3):
+        """Return (indices, scores) of the top_k rows, best first"""
+        return self._top_k(self.scores(query_embedding), top_k)
+
+    def search_batch(self, query_embeddings, top_k=3):
+        """Score a batch of queries with one matrix product; one (indices, scores) per query"""
+        scores = l2_normalize(np.atleast_2d(query_embeddings)) @ self.embeddings.T
+        return [self._top_k(row, top_k) for row in scores]
+
+    def _top_k(self, scores, top_k):
+        n = scores.shape[0]
+        top_k = min(max(int(top_k), 0), n)
+        if top_k == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        if top_k < n:
+            # argpartition is O(n); only the k survivors get fully sorted
+            candidates = np.argpartition(-scores, top_k - 1)[:top_k]
+        else:
+            candidates = np.arange(n)
+        order = candidates[np.argsort(-scores[candidates], kind='stable')]
+        return order, scores[order]
+
+
+def model_fingerprint(model_path):
+    """Hash the files that define a sentence-transformers encoder on disk"""
+    digest = hashlib.sha256()
+    module_dirs = ['']
+    modules_file = os.path.join(model_path, 'modules.json')
+    if os.path.exists(modules_file):
+        with open(modules_file, 'r', encoding='utf-8') as f:
+            module_dirs += [m.get('path', '') for m in json.load(f)]
+
+    for module_dir in sorted(set(module_dirs)):
+        directory = os.path.join(model_path, module_dir)
+        if not os.path.isdir(directory):
+            continue
+        for name in sorted(os.listdir(directory)):
+            path = os.path.join(directory, name)
+            if (not os.path.isfile(path) or name in _NON_MODEL_FILES
+                    or not name.endswith(_MODEL_FILE_SUFFIXES)):
+                continue
+            digest.update(os.path.join(module_dir, name).encode('utf-8'))
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(chunk)
+    return digest.hexdigest()
+
+
+def text_fingerprint(texts):
+    """Hash the exact sequence of texts that was encoded into an index"""
+    digest = hashlib.sha256()
+    for text in texts:
+        digest.update(str(text).encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def save_index(index_dir, embeddings, row_ids, model_fp, text_fp):
+    """Write normalized embeddings, row ids and fingerprints to index_dir
+
+    Layout: embeddings.npy (float32, L2-normalized), row_ids.npy (int64) and
+    meta.json. meta.json is removed first and written last, so a partially
+    written index is never picked up by load_index.
+    """
+    os.makedirs(index_dir, exist_ok=True)
+    meta_path = os.path.join(index_dir, 'meta.json')
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+
+    embeddings = l2_normalize(embeddings)
+    row_ids = np.asarray(row_ids, dtype=np.int64)
+    _atomic_save_npy(os.path.join(index_dir, 'embeddings.npy'), embeddings)
+    _atomic_save_npy(os.path.join(index_dir, 'row_ids.npy'), row_ids)
+
+    meta = {
+        'format_version': INDEX_FORMAT_VERSION,
+        'model_fingerprint': model_fp,
+        'text_fingerprint': text_fp,
+        'size': int(embeddings.shape[0]),
+        'dimension': int(embeddings.shape[1]),
+    }
+    tmp_path = meta_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp_path, meta_path)
+    return meta
+
+
+def load_index(index_dir, model_fp, text_fp, mmap=True):
+    """Load an index written by save_index if its fingerprints match
+
+    Returns (embeddings, row_ids, meta), or None when the index is missing,
+    stale or from a different format version. Embeddings are memory-mapped
+    read-only by default so the OS page cache backs them.
+    """
+    meta_path = os.path.join(index_dir, 'meta.json')
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if (meta.get('format_version') != INDEX_FORMAT_VERSION
+            or meta.get('model_fingerprint') != model_fp
+            or meta.get('text_fingerprint') != text_fp):
+        return None
+
+    mmap_mode = 'r' if mmap else None
+    try:
+        embeddings = np.load(os.path.join(index_dir, 'embeddings.npy'), mmap_mode=mmap_mode)
+        row_ids = np.load(os.path.join(index_dir, 'row_ids.npy'))
+    except (OSError, ValueError):
+        return None
+
+    if embeddings.shape != (meta['size'], meta['dimension']) or len(row_ids) != meta['size']:
+        return None
+    return embeddings, row_ids, meta
+
+
+def _atomic_save_npy(path, array):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        np.save(f, array)
+    os.replace(tmp_path, path)
@@ -0,0 +1,262 @@
+"""
+Shared serving machinery for the FAQ APIs (app.py and faq_api.py)
+"""
+import asyncio
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+logger = logging.getLogger(__name__)
+
+# Inference pool knobs: worker threads, and how many queries may wait or run at once
+INFERENCE_WORKERS = int(os.environ.get("FAQ_INFERENCE_WORKERS", 1))
+INFERENCE_QUEUE_DEPTH = int(os.environ.get("FAQ_INFERENCE_QUEUE_DEPTH", 64))
+RETRY_AFTER_SECONDS = int(os.environ.get("FAQ_RETRY_AFTER_SECONDS", 1))
+
+# Result cache: entries kept per process and how long (seconds) before they expire
+RESULT_CACHE_SIZE = int(os.environ.get("FAQ_RESULT_CACHE_SIZE", 1024))
+RESULT_CACHE_TTL = float(os.environ.get("FAQ_RESULT_CACHE_TTL", 3600))
+
+# Query-embedding cache budget (MB); shared by every FAQBot this process builds
+EMBEDDING_CACHE_MB = float(os.environ.get("FAQ_EMBEDDING_CACHE_MB", 16))
+
+# Start loading the model as soon as the app starts instead of on the first /faq call
+EAGER_LOAD = os.environ.get("FAQ_EAGER_LOAD", "1").lower() not in ("0", "false", "no")
+
+# Queries encoded after loading so kernels and tokenizer caches are hot for real traffic
+WARMUP_QUERIES = [
+    "What is anxiety?",
+    "How can I deal with stress?",
+    "What are the warning signs of depression?",
+    "Where can I find a mental health professional?",
+]
+
+# Micro-batching knobs: how long to hold a query waiting for company, and the batch cap
+BATCH_WINDOW_MS = float(os.environ.get("FAQ_BATCH_WINDOW_MS", 5))
+MAX_BATCH_SIZE = int(os.environ.get("FAQ_MAX_BATCH_SIZE", 32))
+
+_embedding_cache = None
+
+
+def create_faq_bot():
+    """Build a FAQBot configured from the FAQ_* environment variables"""
+    global _embedding_cache
+    # Import FAQBot only when needed
+    from faq_bot import FAQBot
+    from faq_cache import EmbeddingCache
+    if _embedding_cache is None:
+        # Kept across bot rebuilds; FAQBot clears it if the model fingerprint changes
+        _embedding_cache = EmbeddingCache(EMBEDDING_CACHE_MB)
+    return FAQBot(
+        result_cache_size=RESULT_CACHE_SIZE,
+        result_cache_ttl=RESULT_CACHE_TTL,
+        embedding_cache=_embedding_cache
+    )
+
+
+class BotLoader:
+    """Load FAQBot exactly once, in the background or on demand, and report progress
+
+    ``state`` moves through pending -> loading -> warming_up -> ready (or failed).
+    ``bot`` is only published once warm-up has finished, so readiness means the
+    next request will not pay for any one-off initialisation.
+    """
+
+    def __init__(self, factory, warmup_queries=WARMUP_QUERIES):
+        self.factory = factory
+        self.warmup_queries = list(warmup_queries)
+        self.bot = None
+        self.state = "pending"
+        self.error = None
+        self.started_at = None
+        self.ready_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self):
+        return self.bot is not None
+
+    def get(self):
+        """Return the bot, loading it on this thread if nobody has yet (blocking)"""
+        if self.bot is None:
+            with self._lock:
+                if self.bot is None:
+                    self._load()
+        return self.bot
+
+    def start(self, pool):
+        """Kick off loading on the inference pool without blocking the event loop"""
+        if self.state == "pending":
+            asyncio.ensure_future(pool.execute(self._load_in_background))
+
+    def status(self):
+        """Load progress for /livez and /readyz"""
+        now = time.time()
+        status = {"state": self.state, "ready": self.ready}
+        if self.started_at is not None:
+            status["elapsed_seconds"] = round((self.ready_at or now) - self.started_at, 3)
+        if self.error is not None:
+            status["error"] = self.error
+        return status
+
+    def _load_in_background(self):
+        try:
+            self.get()
+        except Exception:
+            # Already logged and recorded in self.error; /readyz reports it
+            pass
+
+    def _load(self):
+        self.state = "loading"
+        self.started_at = time.time()
+        self.error = None
+        logger.info("Loading FAQ Bot model...")
+        try:
+            bot = self.factory()
+        except Exception as e:
+            self.state = "failed"
+            self.error = str(e)
+            logger.error(f"Failed to load FAQ Bot: {str(e)}")
+            raise
+
+        self.state = "warming_up"
+        self._warm_up(bot)
+
+        self.bot = bot
+        self.state = "ready"
+        self.ready_at = time.time()
+        logger.info(f"FAQ Bot model loaded successfully in {self.ready_at - self.started_at:.1f}s!")
+
+    def _warm_up(self, bot):
+        if not self.warmup_queries:
+            return
+        try:
+            # Single and batched paths both get exercised once
+            bot.get_most_similar(self.warmup_queries[0])
+            bot.get_most_similar_batch(self.warmup_queries)
+        except Exception as e:
+            # A failed warm-up only costs latency, not correctness
+            logger.warning(f"FAQ Bot warm-up failed: {str(e)}")
+
+
+class ServiceOverloaded(Exception):
+    """Raised when the inference queue is full; callers should answer 503"""
+
+    def __init__(self, retry_after=RETRY_AFTER_SECONDS):
+        super().__init__("FAQ service is overloaded, please retry shortly")
+        self.retry_after = retry_after
+
+
+class InferencePool:
+    """Bounded thread pool that keeps blocking model work off the event loop
+
+    At most ``workers`` jobs run at once. Admission is counted in queries: once
+    ``queue_depth`` queries are waiting or running, ``reserve`` raises
+    ServiceOverloaded instead of letting latency grow without bound. Threads
+    (not processes) are used so every worker shares the one loaded model;
+    torch releases the GIL inside its kernels.
+    """
+
+    def __init__(self, workers=INFERENCE_WORKERS, queue_depth=INFERENCE_QUEUE_DEPTH,
+                 retry_after=RETRY_AFTER_SECONDS):
+        self.workers = max(int(workers), 1)
+        self.queue_depth = max(int(queue_depth), 1)
+        self.retry_after = retry_after
+        self.pending = 0
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="faq-inference"
+        )
+
+    def reserve(self, n=1):
+        """Claim n query slots or raise ServiceOverloaded (event loop thread only)"""
+        if self.pending + n > self.queue_depth:
+            raise ServiceOverloaded(self.retry_after)
+        self.pending += n
+
+    def release(self, n=1):
+        self.pending = max(self.pending - n, 0)
+
+    async def execute(self, fn, *args, **kwargs):
+        """Run fn on a worker thread without admission control"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(fn, *args, **kwargs))
+
+    async def run(self, fn, *args, weight=1, **kwargs):
+        """Admit ``weight`` queries, run fn on a worker thread, then release them"""
+        self.reserve(weight)
+        try:
+            return await self.execute(fn, *args, **kwargs)
+        finally:
+            self.release(weight)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+
+class MicroBatcher:
+    """Coalesce concurrent single-question lookups into one batched encode
+
+    Queries submitted within ``window_ms`` of the first pending one (or until
+    ``max_batch_size`` are waiting) are answered by a single call to
+    ``FAQBot.get_most_similar_batch`` on the inference pool. Each query takes
+    an admission slot on submit, so overload is reported before it waits.
+    """
+
+    def __init__(self, get_bot, pool, window_ms=BATCH_WINDOW_MS, max_batch_size=MAX_BATCH_SIZE):
+        self.get_bot = get_bot
+        self.pool = pool
+        self.window = max(window_ms, 0) / 1000.0
+        self.max_batch_size = max(int(max_batch_size), 1)
+        self._pending = []
+        self._flush_handle = None
+        # Strong references so in-flight batch tasks are not garbage collected
+        self._tasks = set()
+
+    async def submit(self, question, top_k=3):
+        """Queue one question and wait for its ranked results"""
+        self.pool.reserve()
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((question, top_k, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._run_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch):
+        questions = [question for question, _, _ in batch]
+        # Encode once with the largest top_k; smaller requests take a prefix
+        top_k = max(k for _, k, _ in batch)
+        try:
+            results = await self.pool.execute(self._encode_batch, questions, top_k)
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self.pool.release(len(batch))
+
+        for (_, k, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result[:k])
+
+    def _encode_batch(self, questions, top_k):
+        if len(questions) > 1:
+            logger.debug(f"Micro-batch of {len(questions)} queries")
+        return self.get_bot().get_most_similar_batch(questions, top_k=top_k)
@@ -1,6 +1,8 @@
 """
 Startup script for Render.com deployment
-This ensures the server binds to the port immediately before loading heavy dependencies
+This ensures the server binds to the port immediately before loading heavy dependencies.
+The FAQ model is loaded and warmed up in the background once the server is up;
+/livez answers right away and /readyz turns 200 only when the first query will be fast.
 """
 import os
 import sys
@@ -32,6 +34,7 @@ def main():
         from faq_api import app
         
         logger.info(f"Starting uvicorn server on 0.0.0.0:{port}")
+        logger.info("FAQ model will load in the background; poll /readyz for progress")
         
         # Start server with the app object directly
         uvicorn.run(